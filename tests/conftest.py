@@ -0,0 +1,6 @@
+import pathlib
+import sys
+
+# The workflow scripts import their shared helper as a top-level module
+# (the Pyodide runtime puts spw_input.py next to them).
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1] / "workflows"))
@@ -1,21 +1,31 @@
 # tests/test.py
 
+import json
 import pathlib
 
 import pytest
 
+ROOT = pathlib.Path(__file__).resolve().parents[1]
 
-def test_sum_mm_node(selenium_standalone, web_server_main):
-    """Test sum_mm.py with Pyodide in Node.js runtime."""
 
-    root = pathlib.Path(__file__).resolve().parents[1]
-    sum_mm_path = root / "workflows" / "sum.py"
-    ttl_path = root / "sum_semantic_graph.ttl"
-    result_path = root / "result.ttl"
+@pytest.fixture(scope="session")
+def workflow_sources():
+    """Read sum.py and the input graph once per test session."""
+    sum_mm_path = ROOT / "workflows" / "sum.py"
+    ttl_path = ROOT / "sum_semantic_graph.ttl"
 
     assert sum_mm_path.exists(), f"sum_mm.py not found: {sum_mm_path}"
     assert ttl_path.exists(), f"Input TTL file not found: {ttl_path}"
 
+    return (sum_mm_path.read_text(encoding="utf-8"),
+            ttl_path.read_text(encoding="utf-8"))
+
+
+def test_sum_mm_node(selenium_standalone, web_server_main, workflow_sources):
+    """Test sum_mm.py with Pyodide in Node.js runtime."""
+
+    result_path = ROOT / "result.ttl"
+
     print("Installing rdflib via micropip...")
     selenium_standalone.run_js(
         """
@@ -27,40 +37,46 @@ def test_sum_mm_node(selenium_standalone, web_server_main):
     """
     )
 
-    print("Loading sum_mm.py from filesystem...")
-    sum_mm_code = sum_mm_path.read_text(encoding="utf-8")
-    input_ttl = ttl_path.read_text(encoding="utf-8")
-
-    # Escaping für JavaScript String
-    sum_mm_escaped = (
-        sum_mm_code.replace("\\", "\\\\").replace("`", "\\`").replace("${", "\\${")
+    # Shared helper module imported by every workflow script
+    print("Installing spw_input.py into the Pyodide filesystem...")
+    spw_input_code = (ROOT / "workflows" / "spw_input.py").read_text(encoding="utf-8")
+    selenium_standalone.run_js(
+        f"pyodide.FS.writeFile('spw_input.py', {json.dumps(spw_input_code)});"
     )
-    input_ttl_escaped = (
-        input_ttl.replace("\\", "\\\\").replace("`", "\\`").replace("${", "\\${")
+
+    sum_mm_code, input_ttl = workflow_sources
+
+    # Source goes in as a JSON string literal (no template escaping);
+    # compiled once, the code object is kept in pyodide.globals and exec'd
+    print("Compiling sum_mm.py...")
+    selenium_standalone.run_js(
+        f"""
+        pyodide.globals.set("sum_mm_src", {json.dumps(sum_mm_code)});
+        pyodide.runPython('sum_mm_code_obj = compile(sum_mm_src, "sum.py", "exec")');
+    """
     )
 
     print("Running sum_mm.py...")
     result_ttl = selenium_standalone.run_js(
         f"""
-        const sumMmCode = `{sum_mm_escaped}`;
-        const inputTtl = `{input_ttl_escaped}`;
-        
+        pyodide.globals.set("input_ttl", {json.dumps(input_ttl)});
+
         const result = await pyodide.runPythonAsync(`
 from rdflib import Graph, Namespace, URIRef, BNode, Literal
 from rdflib.namespace import RDF, XSD
 import uuid
 
 # Define the function
-${{sumMmCode}}
+exec(sum_mm_code_obj, globals())
 
 # Extract activity IRI from input graph
 PROV = Namespace("http://www.w3.org/ns/prov#")
 temp_g = Graph()
-temp_g.parse(data='''${{inputTtl}}''', format="turtle")
+temp_g.parse(data=input_ttl, format="turtle")
 activity_iri = str(next(temp_g.subjects(RDF.type, PROV.Activity), "urn:activity:default"))
 
 # Execute with both required parameters
-result = run('''${{inputTtl}}''', activity_iri)
+result = run(input_ttl, activity_iri)
 result
         `);
         
@@ -0,0 +1,151 @@
+"""Native unit tests for CSV parsing in load_csvw_column.run.
+
+CSV bodies come from a stubbed fetch_text; every case runs both with NumPy
+(np.loadtxt fast path where it applies) and without it (csv.reader loop),
+and both must give the same column.
+"""
+
+import re
+
+import pytest
+from rdflib import Graph, Namespace
+from rdflib.namespace import RDF, XSD
+
+import load_csvw_column
+
+QUDT = Namespace("http://qudt.org/schema/qudt/")
+OA = Namespace("http://www.w3.org/ns/oa#")
+
+ACTIVITY = "http://example.com/Load1"
+METADATA = """
+@prefix prov: <http://www.w3.org/ns/prov#> .
+@prefix csvw: <http://www.w3.org/ns/csvw#> .
+@prefix dc:   <http://purl.org/dc/elements/1.1/> .
+@prefix ex:   <http://example.com/> .
+ex:Load1 a prov:Activity .
+ex:TG a csvw:TableGroup ; csvw:table ex:T .
+ex:T csvw:url "http://example.com/data.csv" ; csvw:tableSchema ex:S {dialect} .
+ex:S csvw:column ex:col .
+ex:col csvw:name "{column}" {column_extra} .
+"""
+
+
+@pytest.fixture(params=["numpy", "csv.reader"])
+def load_column(request, monkeypatch):
+    """Run the step on csv_text and return the loaded column values."""
+    if request.param == "csv.reader":
+        monkeypatch.setattr(load_csvw_column, "np", None)
+    elif load_csvw_column.np is None:
+        pytest.skip("NumPy not installed")
+
+    def load(csv_text, column="val", dialect="", column_extra=""):
+        monkeypatch.setattr(load_csvw_column, "fetch_text",
+                            lambda url, encoding="utf-8": csv_text)
+        metadata = METADATA.format(dialect=dialect, column=column,
+                                   column_extra=column_extra)
+        out = Graph().parse(data=load_csvw_column.run(metadata, ACTIVITY),
+                            format="turtle")
+        errors = [str(out.value(ann, RDF.value))
+                  for ann in out.subjects(RDF.type, OA.Annotation)]
+        assert not errors
+
+        values = {}
+        for p in (QUDT.numericValue, RDF.value):
+            for s, o in out.subject_objects(p):
+                idx = int(re.search(r"value(\d+)_", str(s)).group(1))
+                values[idx] = float(o) if o.datatype == XSD.decimal else str(o)
+        return [values[i] for i in sorted(values)]
+
+    return load
+
+
+def test_numeric_column(load_column):
+    assert load_column("id,val\n1,2.5\n2,3\n3,-1e3\n") == [2.5, 3.0, -1000.0]
+
+
+def test_quoted_delimiters(load_column):
+    csv_text = 'id,val,label\n1,"2,5",x\n2,3.5,"a,b"\n'
+    assert load_column(csv_text) == [2.5, 3.5]
+    assert load_column(csv_text, column="label") == ["x", "a,b"]
+
+
+def test_space_after_delimiter_before_quotes(load_column):
+    assert load_column('id, "val"\n1, "2.5"\n') == [2.5]
+
+
+def test_ragged_rows(load_column):
+    # Short rows have no cell for the column and are skipped
+    assert load_column("id,val\n1,2\n3\n4,5,6\n") == [2.0, 5.0]
+
+
+def test_skip_rows_and_header_row_count(load_column):
+    csv_text = "exported 2024-01-01\nid,val\nunit,mm\n1,2\n2,3\n"
+    dialect = "; csvw:dialect [ csvw:skipRows 1 ; csvw:headerRowCount 2 ]"
+    assert load_column(csv_text, dialect=dialect) == [2.0, 3.0]
+
+
+def test_skip_rows_counts_records_not_lines(load_column):
+    # The skipped record holds a quoted line break: two lines, one record
+    csv_text = '"note spanning\ntwo lines",x\nid,val\n1,2\n2,3\n'
+    dialect = "; csvw:dialect [ csvw:skipRows 1 ]"
+    assert load_column(csv_text, dialect=dialect) == [2.0, 3.0]
+
+
+def test_decimal_char(load_column):
+    dialect = '; csvw:dialect [ csvw:delimiter ";" ]'
+    column_extra = '; csvw:datatype [ csvw:decimalChar "," ]'
+    assert load_column("id;val\n1;2,5\n2;3\n", dialect=dialect,
+                       column_extra=column_extra) == [2.5, 3.0]
+
+
+def test_decimal_comma_without_decimal_char(load_column):
+    assert load_column('id,val\n1,"2,5"\n2,3.5\n') == [2.5, 3.5]
+
+
+def test_tab_delimiter(load_column):
+    dialect = '; csvw:dialect [ csvw:delimiter "\\\\t" ]'
+    assert load_column("id\tval\n1\t2.5\n", dialect=dialect) == [2.5]
+
+
+def test_multi_character_delimiter(load_column):
+    dialect = '; csvw:dialect [ csvw:delimiter "||" ]'
+    assert load_column('id||val\n1||2.5\n2||"x"\n', dialect=dialect) == [2.5, "x"]
+
+
+def test_mixed_column_keeps_text(load_column):
+    assert load_column("id,val\n1,2.5\n2,n/a\n3, 4 \n") == [2.5, "n/a", 4.0]
+
+
+def test_numeric_fast_path_only_for_unquoted_numbers():
+    if load_csvw_column.np is None:
+        pytest.skip("NumPy not installed")
+    numeric_column = load_csvw_column._numeric_column
+    assert numeric_column("id,val\n1,2.5\n2,3\n", ",", 1, 1) == [2.5, 3.0]
+    assert numeric_column('id,val\n1,"2.5"\n', ",", 1, 1) is None
+    assert numeric_column("id,val\n1,n/a\n", ",", 1, 1) is None
+    assert numeric_column("id,val\n1\n", ",", 1, 1) is None
+
+
+def test_fetch_text_cache_expires(monkeypatch):
+    bodies = iter(["id,val\n1,2\n", "id,val\n1,3\n"])
+
+    class Response:
+        def __init__(self):
+            self.text = next(bodies)
+
+        def raise_for_status(self):
+            pass
+
+    now = [1000.0]
+    monkeypatch.setattr(load_csvw_column.requests, "get",
+                        lambda url: Response())
+    monkeypatch.setattr(load_csvw_column.time, "monotonic", lambda: now[0])
+    load_csvw_column.clear_fetch_cache()
+
+    url = "http://example.com/data.csv"
+    assert load_csvw_column.fetch_text(url) == "id,val\n1,2\n"
+    now[0] += 1
+    assert load_csvw_column.fetch_text(url) == "id,val\n1,2\n"
+    now[0] += load_csvw_column._FETCH_TTL
+    assert load_csvw_column.fetch_text(url) == "id,val\n1,3\n"
+    load_csvw_column.clear_fetch_cache()
@@ -0,0 +1,61 @@
+"""Native unit tests for the shared spw_input helpers."""
+
+import pytest
+from rdflib import Graph, URIRef
+from rdflib.compare import isomorphic
+
+import spw_input
+
+NT = ('<http://e/a> <http://e/b> <http://e/c> .\n'
+      '<http://e/a> <http://e/d> "x"@en .\n')
+# No prefix/base directive, but not N-Triples: the N-Triples parser reads
+# the first line, then rejects the second.
+TURTLE_NO_PREFIX = ('<http://e/a> <http://e/b> <http://e/c> .\n'
+                    '<http://e/a> <http://e/b> <http://e/d>, <http://e/e> .\n')
+TURTLE = '@prefix e: <http://e/> .\ne:a e:b e:c .\n'
+
+
+@pytest.fixture
+def parse_formats(monkeypatch):
+    formats = []
+    parse = Graph.parse
+
+    def recording_parse(self, *args, **kwargs):
+        formats.append(kwargs.get("format"))
+        return parse(self, *args, **kwargs)
+
+    monkeypatch.setattr(Graph, "parse", recording_parse)
+    return formats
+
+
+def test_parse_turtle_ntriples(parse_formats):
+    g = spw_input.parse_turtle(Graph(), NT)
+    assert parse_formats == ["nt"]
+    assert isomorphic(g, Graph().parse(data=NT, format="nt"))
+
+
+def test_parse_turtle_prefixed(parse_formats):
+    g = spw_input.parse_turtle(Graph(), TURTLE)
+    assert parse_formats == ["turtle"]
+    assert len(g) == 1
+
+
+def test_parse_turtle_falls_back_without_partial_triples(parse_formats):
+    g = spw_input.parse_turtle(Graph(), TURTLE_NO_PREFIX)
+    assert parse_formats == ["nt", "turtle"]
+    assert isomorphic(g, Graph().parse(data=TURTLE_NO_PREFIX, format="turtle"))
+
+
+@pytest.mark.parametrize("data", [NT, TURTLE_NO_PREFIX, TURTLE])
+def test_parse_turtle_keeps_existing_triples(data):
+    g = Graph()
+    g.parse(data="<http://e/x> <http://e/y> <http://e/z> .", format="nt")
+    spw_input.parse_turtle(g, data)
+    expected = Graph().parse(data=data, format="turtle")
+    assert len(g) == len(expected) + 1
+    assert g.value(URIRef("http://e/x"), URIRef("http://e/y")) is not None
+
+
+def test_parse_turtle_error():
+    with pytest.raises(Exception):
+        spw_input.parse_turtle(Graph(), "garbage <<<")
@@ -0,0 +1,130 @@
+"""Native unit tests for the input parsing and summing helpers of sum.py."""
+
+import pytest
+from rdflib import BNode, Graph, Literal, URIRef
+from rdflib.compare import isomorphic
+from rdflib.namespace import XSD
+
+import sum as sum_mm
+
+NT = """\
+# leading comment
+<http://example.com/q1> <http://www.w3.org/1999/02/22-rdf-syntax-ns#type> <http://qudt.org/schema/qudt/QuantityValue> .
+<http://example.com/q1> <http://qudt.org/schema/qudt/numericValue> "2.5"^^<http://www.w3.org/2001/XMLSchema#decimal> .
+<http://example.com/q1> <http://www.w3.org/2000/01/rdf-schema#label> "Länge"@de-DE .
+
+<http://example.com/q1> <http://www.w3.org/2000/01/rdf-schema#comment> "plain" .
+_:b0 <http://example.com/p> <http://example.com/q1> .
+<http://example.com/q1> <http://example.com/p> _:b0 . # trailing comment
+<http://example.com/q1> <http://example.com/p> _:b1 .
+"""
+
+TURTLE = """\
+@prefix ex: <http://example.com/> .
+@prefix qudt: <http://qudt.org/schema/qudt/> .
+ex:q1 a qudt:QuantityValue ; qudt:numericValue 2.5 .
+"""
+
+
+@pytest.fixture(autouse=True)
+def _empty_parse_cache():
+    sum_mm.clear_parse_cache()
+    yield
+    sum_mm.clear_parse_cache()
+
+
+def _graph(triples):
+    g = Graph()
+    for t in triples:
+        g.add(t)
+    return g
+
+
+def test_scan_ntriples_matches_rdflib():
+    triples = sum_mm._scan_ntriples(NT)
+    assert triples is not None
+    assert isomorphic(_graph(triples), Graph().parse(data=NT, format="nt"))
+
+
+def test_scan_ntriples_terms():
+    triples = sum_mm._scan_ntriples(NT)
+    objects = {o for _, _, o in triples}
+    assert Literal("2.5", datatype=XSD.decimal) in objects
+    assert Literal("Länge", lang="de-DE") in objects
+    assert Literal("plain") in objects
+
+    # One BNode per label, shared between subject and object positions
+    b0_subject = triples[4][0]
+    b0_object, b1 = triples[5][2], triples[6][2]
+    assert isinstance(b0_subject, BNode)
+    assert b0_subject is b0_object
+    assert b1 != b0_subject
+
+
+@pytest.mark.parametrize("text", [
+    TURTLE,
+    '<http://e/a> <http://e/b> "with \\"escape\\"" .',
+    '<http://e/a> <http://e/b> <http://e/c> ; <http://e/d> <http://e/e> .',
+    '<http://e/a> <http://e/b> 42 .',
+])
+def test_scan_ntriples_rejects_other_turtle(text):
+    assert sum_mm._scan_ntriples(text) is None
+
+
+def test_parse_input_ntriples():
+    g = sum_mm.parse_input(NT)
+    assert isomorphic(g, Graph().parse(data=NT, format="nt"))
+
+
+def test_parse_input_falls_back_to_turtle_parser():
+    g = sum_mm.parse_input(TURTLE)
+    assert isomorphic(g, Graph().parse(data=TURTLE, format="turtle"))
+
+
+def test_parse_input_cache_hit(monkeypatch):
+    first = sum_mm.parse_input(TURTLE)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("cached input was parsed again")
+
+    monkeypatch.setattr(sum_mm, "_scan_ntriples", fail)
+    monkeypatch.setattr(Graph, "parse", fail)
+    second = sum_mm.parse_input(TURTLE)
+
+    assert second is not first
+    assert isomorphic(first, second)
+
+    # Each caller gets its own graph
+    second.add((URIRef("http://e/x"), URIRef("http://e/y"), Literal(1)))
+    assert len(sum_mm.parse_input(TURTLE)) == len(first)
+
+
+def test_parse_input_cache_miss_after_clear(monkeypatch):
+    sum_mm.parse_input(NT)
+    sum_mm.clear_parse_cache()
+
+    calls = []
+    scan = sum_mm._scan_ntriples
+    monkeypatch.setattr(sum_mm, "_scan_ntriples",
+                        lambda text: calls.append(text) or scan(text))
+    sum_mm.parse_input(NT)
+    assert calls == [NT]
+
+
+def test_parse_cache_is_bounded():
+    for i in range(sum_mm._PARSE_CACHE_SIZE + 5):
+        sum_mm.parse_input(f"<http://e/s{i}> <http://e/p> <http://e/o> .")
+    assert len(sum_mm._PARSE_CACHE) == sum_mm._PARSE_CACHE_SIZE
+
+
+def test_parse_input_error():
+    with pytest.raises(Exception):
+        sum_mm.parse_input("garbage <<<")
+
+
+def test_sum_numeric():
+    assert sum_mm.sum_numeric(["2.0", "3", "-0.5"]) == (4.5, None)
+    assert sum_mm.sum_numeric(["1e3", "1"]) == (1001.0, None)
+    assert sum_mm.sum_numeric(["1", "x", "y"]) == (None, 1)
+    # Left-to-right float addition, as before sum_numeric() existed
+    assert sum_mm.sum_numeric(["0.1"] * 10) == (0.9999999999999999, None)
@@ -11,13 +11,15 @@ Input:  The full urn:vg:data graph as Turtle.
 Output: Turtle with new result triples to merge back into urn:vg:data.
 """
 
-import hashlib
+import math
 import statistics
 
 from rdflib import Graph, Literal, Namespace, URIRef
-from rdflib.namespace import RDF, RDFS, XSD
+from rdflib.namespace import RDF, RDFS, XSD, NamespaceManager
 
 import spw_input
+from spw_input import (activity_output_iri, create_execution_hash,
+                       create_output_iri, data_ns_from_activity, local_name)
 
 # Standard vocabularies
 PROV    = Namespace("http://www.w3.org/ns/prov#")
@@ -28,78 +30,31 @@ OA      = Namespace("http://www.w3.org/ns/oa#")
 DCTERMS = Namespace("http://purl.org/dc/terms/")
 SCHEMA  = Namespace("https://schema.org/")
 
-
-# ---------------------------------------------------------------------------
-# IRI helpers
-# ---------------------------------------------------------------------------
-
-def data_ns_from_activity(activity_iri: str) -> str:
-    """Derive the data namespace from the activity IRI.
-
-    The activity IRI is already in the correct default namespace
-    (e.g. http://example.com/AverageRun_123), so strip the local name
-    to get the base for all output IRIs.
-    """
-    iri = str(activity_iri)
-    idx = max(iri.rfind('#'), iri.rfind('/'))
-    return iri[:idx + 1] if idx >= 0 else iri + '/'
-
-
-def create_execution_hash(activity_iri: str, *input_iris: str) -> str:
-    """Deterministic hash from activity IRI + input IRIs (order-independent)."""
-    sorted_inputs = sorted(str(iri) for iri in input_iris)
-    combined = str(activity_iri) + ''.join(sorted_inputs)
-    return hashlib.sha256(combined.encode('utf-8')).hexdigest()[:16]
-
-
-def local_name(iri) -> str:
-    """Extract the local name from an IRI (after the last # or /)."""
-    s = str(iri)
-    idx = max(s.rfind('#'), s.rfind('/'))
-    return s[idx + 1:] if idx >= 0 else s
-
-
-def create_output_iri(data_ns: str, prefix: str, execution_hash: str) -> URIRef:
-    """Create a data-namespace IRI for an output entity (used for error annotations)."""
-    return URIRef(f"{data_ns}{prefix}_{execution_hash}")
-
-
-def activity_output_iri(activity_iri: str, out_var) -> URIRef:
-    """Derive the output entity IRI from the activity IRI + P-Plan output variable.
-
-    Matches the IRI the app creates during instantiation:
-        activityIri + '_' + localname(outputVariable)
-    e.g. http://example.com/AverageRun_1234_AverageOutput
-    """
-    return URIRef(f"{activity_iri}_{local_name(out_var)}")
+# Standard prefix bindings, built once and shared by every output graph.
+_NSM = NamespaceManager(Graph())
+_NSM.bind("prov",    PROV)
+_NSM.bind("p-plan",  PPLAN)
+_NSM.bind("qudt",    QUDT)
+_NSM.bind("unit",    UNIT)
+_NSM.bind("oa",      OA)
+_NSM.bind("dcterms", DCTERMS)
+_NSM.bind("schema",  SCHEMA)
 
 
 # ---------------------------------------------------------------------------
 # Helpers
 # ---------------------------------------------------------------------------
 
-def cleanup_previous_result(g: Graph, result_iri: URIRef) -> int:
-    """Remove all triples for a previous result entity (idempotent re-runs)."""
-    triples = list(g.triples((result_iri, None, None))) + \
-              list(g.triples((None, None, result_iri)))
-    for t in triples:
-        g.remove(t)
-    return len(triples)
-
-
 def _new_output_graph() -> Graph:
     """Create a fresh output graph with standard prefix bindings."""
     out = Graph()
-    out.bind("prov",    PROV)
-    out.bind("p-plan",  PPLAN)
-    out.bind("qudt",    QUDT)
-    out.bind("unit",    UNIT)
-    out.bind("oa",      OA)
-    out.bind("dcterms", DCTERMS)
-    out.bind("schema",  SCHEMA)
+    out.namespace_manager = _NSM
     return out
 
 
+_UNSET = object()  # no unit seen yet
+
+
 def _add_error(out: Graph, activity, message: str, code: str = None,
                data_ns: str = "http://example.com/",
                execution_hash: str = "unknown",
@@ -141,12 +96,15 @@ def run(input_turtle: str, activity_iri: str) -> str:
 
     Returns:
         Turtle with new result triples to merge back into urn:vg:data
+        (run_graph() returns them as a Graph for in-process chaining)
     """
     data_ns = data_ns_from_activity(activity_iri)
-    g = Graph()
+    # SimpleMemory: the default store's spo/pos/osp indexes without the
+    # per-context bookkeeping this single-graph input never uses.
+    g = Graph(store="SimpleMemory")
 
     try:
-        g.parse(data=input_turtle, format="turtle")
+        spw_input.parse_turtle(g, input_turtle)
     except Exception as e:
         out = _new_output_graph()
         _add_error(out, activity=None,
@@ -154,6 +112,24 @@ def run(input_turtle: str, activity_iri: str) -> str:
                    code="PARSE_ERROR", data_ns=data_ns)
         return out.serialize(format="turtle")
 
+    return run_graph(g, activity_iri).serialize(format="turtle")
+
+
+def run_graph(g, activity_iri: str) -> Graph:
+    """
+    Run the step on an already parsed input graph.
+
+    For in-process pipelines: skips the Turtle round trip that run() does
+    on both sides.
+
+    Args:
+        g: Input graph (rdflib.Graph)
+        activity_iri: IRI of the prov:Activity being executed (default namespace)
+
+    Returns:
+        Graph with only the new result triples
+    """
+    data_ns = data_ns_from_activity(activity_iri)
     activity = URIRef(activity_iri)
 
     step    = g.value(activity, PPLAN.correspondsToStep)
@@ -170,7 +146,7 @@ def run(input_turtle: str, activity_iri: str) -> str:
                    "No prov:Collection found in graph. Run a data loading step first.",
                    code="NO_COLLECTIONS", data_ns=data_ns,
                    execution_hash=execution_hash)
-        return out.serialize(format="turtle")
+        return out
 
     if len(candidates) == 1:
         collection = candidates[0]
@@ -189,58 +165,98 @@ def run(input_turtle: str, activity_iri: str) -> str:
             _add_error(out, activity, str(exc),
                        code="INPUT_CANCELLED", data_ns=data_ns,
                        execution_hash=execution_hash)
-            return out.serialize(format="turtle")
+            return out
         except spw_input.InputFailed as exc:
             _add_error(out, activity, str(exc),
                        code="INPUT_PROMPT_FAILED", data_ns=data_ns,
                        execution_hash=execution_hash)
-            return out.serialize(format="turtle")
+            return out
 
     out.add((activity, PROV.used, collection))
-    members = list(g.objects(collection, PROV.hadMember))
 
-    if len(members) == 0:
-        _add_error(out, activity,
-                   "Collection has no members (prov:hadMember).",
-                   code="EMPTY_COLLECTION", data_ns=data_ns,
-                   execution_hash=execution_hash, target=collection)
-        return out.serialize(format="turtle")
+    # Build result IRI — derived from activityIri + P-Plan output variable local name,
+    # matching the placeholder the app created during workflow instantiation.
+    if out_var:
+        result_iri = activity_output_iri(activity_iri, out_var)
+    else:
+        result_iri = create_output_iri(data_ns, "averageResult", execution_hash)
 
+    # Values are kept for statistics.mean(), which is exactly rounded (a
+    # running float total is not); min and max are tracked as they are read.
     values = []
-    units  = set()
-
-    for member in members:
-        num_value = g.value(member, QUDT.numericValue) or g.value(member, RDF.value)
+    vmin, vmax = math.inf, -math.inf
+    first_unit = _UNSET
+
+    # Loop-invariant terms: Namespace attribute access builds a new URIRef
+    # on every lookup.
+    p_num, p_value, p_unit = QUDT.numericValue, RDF.value, QUDT.unit
+    derived_from = PROV.wasDerivedFrom
+
+    # Members are read straight from the index; the prov:wasDerivedFrom
+    # quads are built as they go instead of in a second pass.
+    derived = []
+    saw_member = False
+    for member in g.objects(collection, PROV.hadMember):
+        saw_member = True
+        # One pass over the member's triples instead of a lookup per property
+        num = value = unit = None
+        for p, o in g.predicate_objects(member):
+            if p == p_num:
+                if num is None:
+                    num = o
+            elif p == p_value:
+                if value is None:
+                    value = o
+            elif p == p_unit:
+                if unit is None:
+                    unit = o
+        num_value = num or value
 
         if num_value is None:
             _add_error(out, activity,
                        f"Member {member} has no qudt:numericValue or rdf:value.",
                        "MISSING_NUMERIC_VALUE", data_ns=data_ns,
                        execution_hash=execution_hash, target=member)
-            return out.serialize(format="turtle")
+            return out
 
         try:
-            values.append(float(num_value))
+            v = float(num_value)
         except Exception:
             _add_error(out, activity,
                        f"Member {member} has non-numeric value {num_value}.",
                        "NON_NUMERIC_VALUE", data_ns=data_ns,
                        execution_hash=execution_hash, target=member)
-            return out.serialize(format="turtle")
+            return out
 
-        unit = g.value(member, QUDT.unit)
-        if unit is not None:
-            units.add(unit)
+        values.append(v)
+        derived.append((result_iri, derived_from, member, out))
+        if v < vmin:
+            vmin = v
+        if v > vmax:
+            vmax = v
 
-    if len(units) > 1:
+        if unit is not None:
+            if first_unit is _UNSET:
+                first_unit = unit
+            elif unit != first_unit:
+                # The first disagreeing member is enough to reject the input
+                _add_error(out, activity,
+                           f"Collection members have different units: {first_unit}, {unit}",
+                           code="UNIT_MISMATCH", data_ns=data_ns,
+                           execution_hash=execution_hash)
+                return out
+
+    if not saw_member:
         _add_error(out, activity,
-                   "Collection members have different units: " +
-                   ", ".join(str(u) for u in units),
-                   code="UNIT_MISMATCH", data_ns=data_ns,
-                   execution_hash=execution_hash)
-        return out.serialize(format="turtle")
+                   "Collection has no members (prov:hadMember).",
+                   code="EMPTY_COLLECTION", data_ns=data_ns,
+                   execution_hash=execution_hash, target=collection)
+        return out
 
-    unit_iri = next(iter(units)) if units else g.value(collection, QUDT.unit)
+    if first_unit is not _UNSET:
+        unit_iri = first_unit
+    else:
+        unit_iri = g.value(collection, QUDT.unit)
 
     try:
         average = statistics.mean(values)
@@ -248,35 +264,30 @@ def run(input_turtle: str, activity_iri: str) -> str:
         _add_error(out, activity, f"Failed to calculate mean: {e}",
                    code="CALCULATION_ERROR", data_ns=data_ns,
                    execution_hash=execution_hash)
-        return out.serialize(format="turtle")
+        return out
 
-    # Build result IRI — derived from activityIri + P-Plan output variable local name,
-    # matching the placeholder the app created during workflow instantiation.
-    if out_var:
-        result_iri = activity_output_iri(activity_iri, out_var)
-    else:
-        result_iri = create_output_iri(data_ns, "averageResult", execution_hash)
-
-    out.add((result_iri, RDF.type,          QUDT.QuantityValue))
-    out.add((result_iri, RDF.type,          PROV.Entity))
-    out.add((result_iri, RDF.type,          PPLAN.Entity))
-    out.add((result_iri, RDFS.label,        Literal(f"Average of {len(values)} values")))
-    out.add((result_iri, QUDT.numericValue, Literal(average, datatype=XSD.decimal)))
+    quads = [
+        (result_iri, RDF.type,          QUDT.QuantityValue,                          out),
+        (result_iri, RDF.type,          PROV.Entity,                                 out),
+        (result_iri, RDF.type,          PPLAN.Entity,                                out),
+        (result_iri, RDFS.label,        Literal(f"Average of {len(values)} values"), out),
+        (result_iri, QUDT.numericValue, Literal(average, datatype=XSD.decimal),      out),
+    ]
 
     if unit_iri:
-        out.add((result_iri, QUDT.unit, unit_iri))
+        quads.append((result_iri, QUDT.unit, unit_iri, out))
 
-    out.add((result_iri, PROV.wasGeneratedBy, activity))
-    out.add((result_iri, PROV.wasDerivedFrom, collection))
-    for member in members:
-        out.add((result_iri, PROV.wasDerivedFrom, member))
+    quads.append((result_iri, PROV.wasGeneratedBy, activity,   out))
+    quads.append((result_iri, PROV.wasDerivedFrom, collection, out))
+    quads.extend(derived)
 
     if out_var:
-        out.add((result_iri, PPLAN.correspondsToVariable, out_var))
+        quads.append((result_iri, PPLAN.correspondsToVariable, out_var, out))
 
     # Calculation metadata using Schema.org and Dublin Core
-    out.add((result_iri, DCTERMS.description, Literal("arithmetic mean")))
-    out.add((result_iri, SCHEMA.minValue,     Literal(min(values), datatype=XSD.decimal)))
-    out.add((result_iri, SCHEMA.maxValue,     Literal(max(values), datatype=XSD.decimal)))
+    quads.append((result_iri, DCTERMS.description, Literal("arithmetic mean"),          out))
+    quads.append((result_iri, SCHEMA.minValue,     Literal(vmin, datatype=XSD.decimal), out))
+    quads.append((result_iri, SCHEMA.maxValue,     Literal(vmax, datatype=XSD.decimal), out))
+    out.addN(quads)
 
-    return out.serialize(format="turtle")
+    return out
@@ -27,15 +27,24 @@ Follows the P-Plan + PROV-O two-level model:
         prov:hadMember                :value0_abc, :value1_abc, ...
 """
 
-import hashlib
+import csv
+import io
+import time
 from typing import Optional
 
 import requests
 from rdflib import Graph, Literal, Namespace, URIRef
 from rdflib.collection import Collection as RDFList
-from rdflib.namespace import RDF, RDFS, XSD
+from rdflib.namespace import RDF, RDFS, XSD, NamespaceManager
 
 import spw_input
+from spw_input import (activity_output_iri, create_execution_hash,
+                       create_output_iri, data_ns_from_activity, local_name)
+
+try:  # optional: C-level parsing of all-numeric columns
+    import numpy as np
+except ImportError:  # pragma: no cover - plain Python fallback below
+    np = None
 
 # Standard vocabularies
 PROV  = Namespace("http://www.w3.org/ns/prov#")
@@ -48,59 +57,45 @@ DCTERMS = Namespace("http://purl.org/dc/terms/")
 SCHEMA  = Namespace("https://schema.org/")
 DC      = Namespace("http://purl.org/dc/elements/1.1/")
 
-
-# ---------------------------------------------------------------------------
-# IRI helpers
-# ---------------------------------------------------------------------------
-
-def data_ns_from_activity(activity_iri: str) -> str:
-    iri = str(activity_iri)
-    idx = max(iri.rfind('#'), iri.rfind('/'))
-    return iri[:idx + 1] if idx >= 0 else iri + '/'
-
-
-def create_execution_hash(activity_iri: str, *input_iris: str) -> str:
-    sorted_inputs = sorted(str(iri) for iri in input_iris)
-    combined = str(activity_iri) + ''.join(sorted_inputs)
-    return hashlib.sha256(combined.encode('utf-8')).hexdigest()[:16]
-
-
-def local_name(iri) -> str:
-    s = str(iri)
-    idx = max(s.rfind('#'), s.rfind('/'))
-    return s[idx + 1:] if idx >= 0 else s
-
-
-def create_output_iri(data_ns: str, prefix: str, execution_hash: str) -> URIRef:
-    return URIRef(f"{data_ns}{prefix}_{execution_hash}")
-
-
-def activity_output_iri(activity_iri: str, out_var) -> URIRef:
-    return URIRef(f"{activity_iri}_{local_name(out_var)}")
+# CSVW unit strings → QUDT units, keys lowercased to match the lookup.
+_CSVW_UNIT_MAP = {
+    "mm":         UNIT.MilliM,
+    "millimeter": UNIT.MilliM,
+    "m":          UNIT.M,
+    "meter":      UNIT.M,
+    "cm":         UNIT.CentiM,
+    "centimeter": UNIT.CentiM,
+    "kg":         UNIT.KiloGM,
+    "kilogram":   UNIT.KiloGM,
+    "g":          UNIT.GM,
+    "gram":       UNIT.GM,
+    "s":          UNIT.SEC,
+    "second":     UNIT.SEC,
+    "°c":         UNIT.DEG_C,
+    "celsius":    UNIT.DEG_C,
+    "k":          UNIT.K,
+    "kelvin":     UNIT.K,
+}
+
+# Standard prefix bindings, built once and shared by every output graph.
+_NSM = NamespaceManager(Graph())
+_NSM.bind("prov",    PROV)
+_NSM.bind("p-plan",  PPLAN)
+_NSM.bind("qudt",    QUDT)
+_NSM.bind("unit",    UNIT)
+_NSM.bind("csvw",    CSVW)
+_NSM.bind("oa",      OA)
+_NSM.bind("dcterms", DCTERMS)
+_NSM.bind("schema",  SCHEMA)
 
 
 # ---------------------------------------------------------------------------
 # Helpers
 # ---------------------------------------------------------------------------
 
-def cleanup_previous_result(g: Graph, result_iri: URIRef) -> int:
-    triples = list(g.triples((result_iri, None, None))) + \
-              list(g.triples((None, None, result_iri)))
-    for t in triples:
-        g.remove(t)
-    return len(triples)
-
-
 def _new_output_graph() -> Graph:
     out = Graph()
-    out.bind("prov",    PROV)
-    out.bind("p-plan",  PPLAN)
-    out.bind("qudt",    QUDT)
-    out.bind("unit",    UNIT)
-    out.bind("csvw",    CSVW)
-    out.bind("oa",      OA)
-    out.bind("dcterms", DCTERMS)
-    out.bind("schema",  SCHEMA)
+    out.namespace_manager = _NSM
     return out
 
 
@@ -125,28 +120,60 @@ def _add_error(out: Graph, activity, message: str, code: str = None,
         out.add((ann_iri, DCTERMS.identifier, Literal(code, datatype=XSD.string)))
 
 
+# Decoded CSV bodies per (url, encoding) with their fetch time. Activities
+# loading columns of the same table within _FETCH_TTL seconds skip the
+# network round trip; after that the URL is fetched again, so a CSV edited
+# at the same URL is picked up by the next run and old bodies do not stay in
+# the worker's memory. Failed requests raise and are not cached.
+_FETCH_CACHE: dict = {}
+_FETCH_TTL = 30.0  # seconds
+
+
+def fetch_text(url: str, encoding: str = "utf-8") -> str:
+    now = time.monotonic()
+    for key, (fetched, _) in list(_FETCH_CACHE.items()):
+        if now - fetched > _FETCH_TTL:
+            del _FETCH_CACHE[key]
+
+    cached = _FETCH_CACHE.get((url, encoding))
+    if cached is not None:
+        return cached[1]
+
+    response = requests.get(url)
+    response.raise_for_status()
+    response.encoding = encoding
+    _FETCH_CACHE[(url, encoding)] = (now, response.text)
+    return response.text
+
+
+def clear_fetch_cache() -> None:
+    """Drop all cached CSV bodies."""
+    _FETCH_CACHE.clear()
+
+
+# All-numeric column in one pass of NumPy's C parser. Returns None when
+# NumPy is missing or any cell is not a plain "."-decimal number (text,
+# empty cells, short rows) so the caller falls back to the per-cell
+# csv.reader loop. Text with quotes is left to csv.reader as well: a quoted
+# field may span lines, and loadtxt skips physical lines where the caller
+# counts CSV records.
+def _numeric_column(text: str, delimiter: str, first_row: int,
+                    column_index: int) -> Optional[list]:
+    if np is None or len(delimiter) != 1 or '"' in text:
+        return None
+    try:
+        column = np.loadtxt(io.StringIO(text), dtype=np.float64,
+                            delimiter=delimiter, skiprows=first_row,
+                            usecols=(column_index,), comments=None, ndmin=1)
+    except ValueError:
+        return None
+    return column.tolist()
+
+
 def map_csvw_unit_to_qudt(csvw_unit: Optional[str]) -> Optional[URIRef]:
     if not csvw_unit:
         return None
-    unit_map = {
-        "mm": UNIT.MilliM,
-        "millimeter": UNIT.MilliM,
-        "m": UNIT.M,
-        "meter": UNIT.M,
-        "cm": UNIT.CentiM,
-        "centimeter": UNIT.CentiM,
-        "kg": UNIT.KiloGM,
-        "kilogram": UNIT.KiloGM,
-        "g": UNIT.GM,
-        "gram": UNIT.GM,
-        "s": UNIT.SEC,
-        "second": UNIT.SEC,
-        "°C": UNIT.DEG_C,
-        "celsius": UNIT.DEG_C,
-        "K": UNIT.K,
-        "kelvin": UNIT.K,
-    }
-    return unit_map.get(csvw_unit.lower(), None)
+    return _CSVW_UNIT_MAP.get(csvw_unit.lower())
 
 
 # ---------------------------------------------------------------------------
@@ -155,10 +182,12 @@ def map_csvw_unit_to_qudt(csvw_unit: Optional[str]) -> Optional[URIRef]:
 
 def run(input_turtle: str, activity_iri: str) -> str:
     data_ns = data_ns_from_activity(activity_iri)
-    g = Graph()
+    # SimpleMemory: the default store's spo/pos/osp indexes without the
+    # per-context bookkeeping this single-graph input never uses.
+    g = Graph(store="SimpleMemory")
 
     try:
-        g.parse(data=input_turtle, format="turtle")
+        spw_input.parse_turtle(g, input_turtle)
     except Exception as e:
         out = _new_output_graph()
         _add_error(out, activity=None,
@@ -166,6 +195,13 @@ def run(input_turtle: str, activity_iri: str) -> str:
                    code="PARSE_ERROR", data_ns=data_ns)
         return out.serialize(format="turtle")
 
+    return run_graph(g, activity_iri).serialize(format="turtle")
+
+
+# In-process variant of run(): takes the parsed input graph and returns the
+# output Graph, skipping the Turtle round trip.
+def run_graph(g, activity_iri: str) -> Graph:
+    data_ns = data_ns_from_activity(activity_iri)
     activity = URIRef(activity_iri)
 
     step    = g.value(activity, PPLAN.correspondsToStep)
@@ -185,7 +221,7 @@ def run(input_turtle: str, activity_iri: str) -> str:
                    "No csvw:TableGroup found in graph. Load CSVW metadata first.",
                    code="NO_TABLE_GROUPS", data_ns=data_ns,
                    execution_hash=execution_hash)
-        return out.serialize(format="turtle")
+        return out
 
     if len(table_groups) == 1:
         selected_tg = table_groups[0]
@@ -204,12 +240,12 @@ def run(input_turtle: str, activity_iri: str) -> str:
             _add_error(out, activity, str(exc),
                        code="INPUT_CANCELLED", data_ns=data_ns,
                        execution_hash=execution_hash)
-            return out.serialize(format="turtle")
+            return out
         except spw_input.InputFailed as exc:
             _add_error(out, activity, str(exc),
                        code="INPUT_PROMPT_FAILED", data_ns=data_ns,
                        execution_hash=execution_hash)
-            return out.serialize(format="turtle")
+            return out
 
     prov_triples.append((activity, PROV.used, selected_tg))
 
@@ -247,7 +283,7 @@ def run(input_turtle: str, activity_iri: str) -> str:
                    "No csvw:Column found in selected data source. Check CSVW metadata structure.",
                    code="NO_COLUMNS", data_ns=data_ns,
                    execution_hash=execution_hash)
-        return out.serialize(format="turtle")
+        return out
 
     if len(columns) == 1:
         selected_col = columns[0]
@@ -264,12 +300,12 @@ def run(input_turtle: str, activity_iri: str) -> str:
             _add_error(out, activity, str(exc),
                        code="INPUT_CANCELLED", data_ns=data_ns,
                        execution_hash=execution_hash)
-            return out.serialize(format="turtle")
+            return out
         except spw_input.InputFailed as exc:
             _add_error(out, activity, str(exc),
                        code="INPUT_PROMPT_FAILED", data_ns=data_ns,
                        execution_hash=execution_hash)
-            return out.serialize(format="turtle")
+            return out
 
     column_name = selected_col['name']
     column_entity = selected_col['column']
@@ -280,7 +316,7 @@ def run(input_turtle: str, activity_iri: str) -> str:
                    "Selected column has no csvw:name. Cannot match CSV header.",
                    code="NO_COLUMN_NAME", data_ns=data_ns,
                    execution_hash=execution_hash)
-        return out.serialize(format="turtle")
+        return out
 
     # -----------------------------------------------------------------------
     # Derive CSV URL and unit from graph
@@ -291,7 +327,7 @@ def run(input_turtle: str, activity_iri: str) -> str:
                    "No csvw:url found on table. Cannot fetch CSV data.",
                    code="NO_CSV_URL", data_ns=data_ns,
                    execution_hash=execution_hash)
-        return out.serialize(format="turtle")
+        return out
     csv_url = str(csv_url_node)
 
     # Try qudt:unit on column entity first, then dc:unit string for fallback mapping
@@ -346,26 +382,30 @@ def run(input_turtle: str, activity_iri: str) -> str:
     # Fetch CSV and extract column
     # -----------------------------------------------------------------------
     try:
-        csv_response = requests.get(csv_url)
-        csv_response.raise_for_status()
-        csv_response.encoding = encoding
+        csv_text = fetch_text(csv_url, encoding)
     except Exception as e:
         _add_error(out, activity,
                    f"Failed to fetch CSV data from {csv_url}: {e}",
                    code="CSV_FETCH_ERROR", data_ns=data_ns,
                    execution_hash=execution_hash)
-        return out.serialize(format="turtle")
-
-    lines = csv_response.text.strip().split("\n")
-    data_lines = lines[skip_rows:]
-    if len(data_lines) < header_row_count + 1:
+        return out
+
+    text = csv_text.strip()
+    if len(delimiter) == 1:
+        rows = list(csv.reader(io.StringIO(text), delimiter=delimiter,
+                               skipinitialspace=True))
+    else:  # csv.reader only takes single-character delimiters
+        rows = [[f.strip().strip('"') for f in line.split(delimiter)]
+                for line in text.split("\n")]
+    data_rows = rows[skip_rows:]
+    if len(data_rows) < header_row_count + 1:
         _add_error(out, activity,
                    "CSV file has no data rows after skipping header.",
                    code="EMPTY_CSV", data_ns=data_ns,
                    execution_hash=execution_hash)
-        return out.serialize(format="turtle")
+        return out
 
-    header = [h.strip().strip('"') for h in data_lines[0].split(delimiter)]
+    header = [h.strip() for h in data_rows[0]]
     try:
         column_index = header.index(column_name)
     except ValueError:
@@ -373,13 +413,19 @@ def run(input_turtle: str, activity_iri: str) -> str:
                    f"Column '{column_name}' not found in CSV header: {header}",
                    code="COLUMN_NOT_FOUND", data_ns=data_ns,
                    execution_hash=execution_hash)
-        return out.serialize(format="turtle")
-
-    values = []
-    for line in data_lines[header_row_count:]:
-        fields = line.split(delimiter)
-        if column_index < len(fields):
-            value_str = fields[column_index].strip().strip('"')
+        return out
+
+    values = None
+    all_numeric = True  # every value parsed as float
+    if decimal_char == ".":
+        values = _numeric_column(text, delimiter, skip_rows + header_row_count,
+                                 column_index)
+    if values is None:
+        values = []
+        for fields in data_rows[header_row_count:]:
+            if column_index >= len(fields):
+                continue
+            value_str = fields[column_index].strip()
             try:
                 values.append(float(value_str))
             except ValueError:
@@ -397,13 +443,14 @@ def run(input_turtle: str, activity_iri: str) -> str:
                     except ValueError:
                         pass
                 values.append(value_str)
+                all_numeric = False
 
     if len(values) == 0:
         _add_error(out, activity,
                    f"Column '{column_name}' loaded but contains no values.",
                    code="EMPTY_COLUMN", data_ns=data_ns,
                    execution_hash=execution_hash)
-        return out.serialize(format="turtle")
+        return out
 
     # -----------------------------------------------------------------------
     # Build output collection
@@ -413,39 +460,67 @@ def run(input_turtle: str, activity_iri: str) -> str:
     else:
         result_iri = create_output_iri(data_ns, "columnData", execution_hash)
 
-    out.add((result_iri, RDF.type, PROV.Collection))
-    out.add((result_iri, RDF.type, PROV.Entity))
-    out.add((result_iri, RDF.type, PPLAN.Entity))
-    out.add((result_iri, RDFS.label, Literal(f"Column data: {selected_col['display']}")))
-    out.add((result_iri, PROV.wasGeneratedBy, activity))
-    out.add((result_iri, PROV.wasDerivedFrom, selected_tg))
-    out.add((result_iri, PROV.wasDerivedFrom, column_entity))
+    quads = [
+        (result_iri, RDF.type,            PROV.Collection,                                    out),
+        (result_iri, RDF.type,            PROV.Entity,                                        out),
+        (result_iri, RDF.type,            PPLAN.Entity,                                       out),
+        (result_iri, RDFS.label,          Literal(f"Column data: {selected_col['display']}"), out),
+        (result_iri, PROV.wasGeneratedBy, activity,                                           out),
+        (result_iri, PROV.wasDerivedFrom, selected_tg,                                        out),
+        (result_iri, PROV.wasDerivedFrom, column_entity,                                      out),
+    ]
 
     if out_var:
-        out.add((result_iri, PPLAN.correspondsToVariable, out_var))
+        quads.append((result_iri, PPLAN.correspondsToVariable, out_var, out))
 
     if unit_uri:
-        out.add((result_iri, QUDT.unit, unit_uri))
-    out.add((result_iri, DCTERMS.source, Literal(column_name)))
-    out.add((result_iri, SCHEMA.numberOfItems, Literal(len(values), datatype=XSD.integer)))
+        quads.append((result_iri, QUDT.unit, unit_uri, out))
+    quads.append((result_iri, DCTERMS.source, Literal(column_name), out))
+    quads.append((result_iri, SCHEMA.numberOfItems,
+                  Literal(len(values), datatype=XSD.integer), out))
 
     # Add provenance triples from input resolution
-    for s, p, o in prov_triples:
-        out.add((s, p, o))
-
-    for idx, value in enumerate(values):
-        value_iri = create_output_iri(data_ns, f"value{idx}", execution_hash)
-        out.add((value_iri, RDF.type, PROV.Entity))
+    quads.extend((s, p, o, out) for s, p, o in prov_triples)
+
+    # Loop-invariant terms: Namespace attribute access builds a new URIRef
+    # on every lookup, i.e. several times per CSV row.
+    rdf_type, rdf_value = RDF.type, RDF.value
+    prov_entity, had_member = PROV.Entity, PROV.hadMember
+    qudt_qv, qudt_num, qudt_unit = QUDT.QuantityValue, QUDT.numericValue, QUDT.unit
+    xsd_decimal, xsd_string = XSD.decimal, XSD.string
+    append = quads.append
+
+    # repr() is the lexical form rdflib itself gives a float typed
+    # xsd:decimal; normalize=False skips re-deriving it from the value.
+    if unit_uri and all_numeric:
+        # Common case: a numeric column with a unit, every row a QuantityValue
+        for idx, value in enumerate(values):
+            value_iri = create_output_iri(data_ns, f"value{idx}", execution_hash)
+            num = Literal(repr(value), datatype=xsd_decimal, normalize=False)
+            append((value_iri,  rdf_type,   prov_entity, out))
+            append((value_iri,  rdf_type,   qudt_qv,     out))
+            append((value_iri,  qudt_num,   num,         out))
+            append((value_iri,  qudt_unit,  unit_uri,    out))
+            append((result_iri, had_member, value_iri,   out))
+    else:
+        for idx, value in enumerate(values):
+            value_iri = create_output_iri(data_ns, f"value{idx}", execution_hash)
+            append((value_iri, rdf_type, prov_entity, out))
+
+            if isinstance(value, float) and unit_uri:
+                num = Literal(repr(value), datatype=xsd_decimal, normalize=False)
+                append((value_iri, rdf_type,  qudt_qv,  out))
+                append((value_iri, qudt_num,  num,      out))
+                append((value_iri, qudt_unit, unit_uri, out))
+            elif isinstance(value, float):
+                num = Literal(repr(value), datatype=xsd_decimal, normalize=False)
+                append((value_iri, rdf_value, num, out))
+            else:
+                append((value_iri, rdf_value, Literal(str(value), datatype=xsd_string), out))
 
-        if isinstance(value, float) and unit_uri:
-            out.add((value_iri, RDF.type,            QUDT.QuantityValue))
-            out.add((value_iri, QUDT.numericValue,   Literal(value, datatype=XSD.decimal)))
-            out.add((value_iri, QUDT.unit,           unit_uri))
-        elif isinstance(value, float):
-            out.add((value_iri, RDF.value, Literal(value, datatype=XSD.decimal)))
-        else:
-            out.add((value_iri, RDF.value, Literal(str(value), datatype=XSD.string)))
+            append((result_iri, had_member, value_iri, out))
 
-        out.add((result_iri, PROV.hadMember, value_iri))
+    # One bulk insert instead of several Graph.add calls per row
+    out.addN(quads)
 
-    return out.serialize(format="turtle")
+    return out
@@ -3,14 +3,16 @@ Shared input resolution library for SPW workflow scripts.
 
 Provides reusable functions for discovering candidate entities in the graph,
 prompting users via select dropdowns, copying properties between entities,
-and recording provenance. Used by workflow scripts that need dynamic input
-resolution at runtime.
+recording provenance, and deriving output IRIs. Used by workflow scripts that
+need dynamic input resolution at runtime.
 
 request_input() is injected by the Pyodide worker runtime — not imported.
 """
 
-from rdflib import Namespace, URIRef
-from rdflib.namespace import RDF, RDFS, XSD
+import hashlib
+
+from rdflib import Graph, Namespace, URIRef
+from rdflib.namespace import RDF, RDFS
 
 PROV  = Namespace("http://www.w3.org/ns/prov#")
 PPLAN = Namespace("http://purl.org/net/p-plan#")
@@ -26,6 +28,29 @@ class InputFailed(Exception):
     pass
 
 
+def parse_turtle(g, data: str):
+    """Parse Turtle into g, taking rdflib's N-Triples parser when possible.
+
+    N-Triples is the line-based subset of Turtle and parses several times
+    faster than the full Turtle grammar. Data without prefix/base directives
+    near the top (machine-written graphs, outputs of earlier steps) is tried
+    as N-Triples first; if that parser rejects it, it is parsed as Turtle.
+    Like Graph.parse, the triples are added to whatever g already holds.
+    """
+    head = data[:2048].lower()
+    if "prefix" not in head and "base" not in head:
+        # Scratch graph, so a partial parse never reaches g
+        nt = Graph()
+        try:
+            nt.parse(data=data, format="nt")
+        except Exception:
+            pass
+        else:
+            g.addN((s, p, o, g) for s, p, o in nt)
+            return g
+    return g.parse(data=data, format="turtle")
+
+
 def get_var_label(g, entity) -> str:
     """Return rdfs:label of the p-plan:Variable this entity corresponds to."""
     var = g.value(entity, PPLAN.correspondsToVariable)
@@ -45,18 +70,20 @@ def find_candidates(g, activity, rdf_type, value_predicate=None):
     If value_predicate is given, only returns candidates that have a value
     for that predicate.
     """
-    own_inputs = set(
-        e for e in g.objects(activity, PROV.used)
-        if (e, PPLAN.correspondsToVariable, None) in g
-    )
+    placeholders = set(g.subjects(PPLAN.correspondsToVariable, None))
+    own_inputs = set(g.objects(activity, PROV.used)) & placeholders
     own_outputs = set(g.subjects(PROV.wasGeneratedBy, activity))
     exclude = own_inputs | own_outputs
 
+    with_value = None
+    if value_predicate is not None:
+        with_value = set(g.subjects(value_predicate, None))
+
     candidates = []
     for entity in g.subjects(RDF.type, rdf_type):
         if entity in exclude:
             continue
-        if value_predicate is not None and g.value(entity, value_predicate) is None:
+        if with_value is not None and entity not in with_value:
             continue
         candidates.append(entity)
     return candidates
@@ -105,3 +132,75 @@ def make_provenance(activity, placeholder, selected):
         (activity, PROV.used, selected),
         (placeholder, PROV.wasDerivedFrom, selected),
     ]
+
+
+# ---------------------------------------------------------------------------
+# IRI helpers (shared by all workflow scripts)
+# ---------------------------------------------------------------------------
+
+def data_ns_from_activity(activity_iri: str) -> str:
+    """Derive the data namespace from the activity IRI.
+
+    The activity IRI is already in the correct default namespace
+    (e.g. http://example.com/SumRun_123), so we strip the local name
+    to get the base namespace for all output IRIs.
+    """
+    iri = str(activity_iri)
+    idx = max(iri.rfind('#'), iri.rfind('/'))
+    return iri[:idx + 1] if idx >= 0 else iri + '/'
+
+
+# Hash behind create_execution_hash. Output IRIs embed it, so the default
+# stays "sha256" to keep IRIs stable across versions; "blake2b" is faster
+# but yields different IRIs for the same run.
+EXECUTION_HASH_ALGORITHM = "sha256"
+
+
+def create_execution_hash(activity_iri: str, *input_iris: str) -> str:
+    """Deterministic hash from activity IRI + input IRIs (order-independent)."""
+    if EXECUTION_HASH_ALGORITHM == "blake2b":
+        h = hashlib.blake2b(str(activity_iri).encode('utf-8'), digest_size=8)
+        for iri in sorted(str(i) for i in input_iris):
+            h.update(b'\x00')
+            h.update(iri.encode('utf-8'))
+        return h.hexdigest()
+    # Streamed updates hash the same bytes as the concatenated string.
+    h = hashlib.sha256(str(activity_iri).encode('utf-8'))
+    for iri in sorted(str(i) for i in input_iris):
+        h.update(iri.encode('utf-8'))
+    return h.hexdigest()[:16]
+
+
+def local_name(iri) -> str:
+    """Extract the local name from an IRI (after the last # or /)."""
+    s = str(iri)
+    idx = max(s.rfind('#'), s.rfind('/'))
+    return s[idx + 1:] if idx >= 0 else s
+
+
+def create_output_iri(data_ns: str, prefix: str, execution_hash: str) -> URIRef:
+    """Create a data-namespace IRI for an output entity (used for error annotations)."""
+    return URIRef(f"{data_ns}{prefix}_{execution_hash}")
+
+
+def activity_output_iri(activity_iri: str, out_var) -> URIRef:
+    """Derive the output entity IRI from the activity IRI + P-Plan output variable.
+
+    Matches the IRI the app creates during instantiation:
+        activityIri + '_' + localname(outputVariable)
+    e.g. http://example.com/SumRun_1234_SumOutput
+    """
+    return URIRef(f"{activity_iri}_{local_name(out_var)}")
+
+
+def cleanup_previous_result(g, result_iri: URIRef) -> int:
+    """Remove all triples for a previous result entity (idempotent re-runs)."""
+    # First runs have nothing to remove: two indexed membership checks
+    # instead of collecting both full pattern scans.
+    if (result_iri, None, None) not in g and (None, None, result_iri) not in g:
+        return 0
+    triples = list(g.triples((result_iri, None, None))) + \
+              list(g.triples((None, None, result_iri)))
+    for t in triples:
+        g.remove(t)
+    return len(triples)
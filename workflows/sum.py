@@ -9,11 +9,42 @@ Output: Single QUDT QuantityValue with the sum and shared unit.
 """
 
 import hashlib
+import re
+from collections import OrderedDict, namedtuple
 
-from rdflib import Graph, Namespace, URIRef, Literal
-from rdflib.namespace import RDF, RDFS, XSD
+from rdflib import BNode, Graph, Namespace, URIRef, Literal
+from rdflib.namespace import RDF, RDFS, XSD, NamespaceManager
 
 import spw_input
+from spw_input import (activity_output_iri, create_execution_hash,
+                       create_output_iri, data_ns_from_activity, local_name)
+
+# Optional C-backed store: oxrdflib registers the "Oxigraph" store and its
+# Rust Turtle parser. Falls back to rdflib's pure-Python parser and its
+# SimpleMemory store (the same spo/pos/osp dict indexes as the default
+# store, without its per-context bookkeeping; these graphs are never
+# context-aware).
+try:
+    import oxrdflib  # noqa: F401
+    _STORE, _TURTLE = "Oxigraph", "ox-turtle"
+except ImportError:
+    _STORE, _TURTLE = "SimpleMemory", "turtle"
+
+# Parsed input triples keyed by a digest of the Turtle text (LRU). Re-runs and
+# retries of a step usually receive the identical graph.
+_PARSE_CACHE: "OrderedDict[bytes, tuple]" = OrderedDict()
+_PARSE_CACHE_SIZE = 32
+
+# One N-Triples statement per line (absolute IRIs, blank nodes, literals
+# without escapes). Inputs written entirely in this Turtle subset are read
+# by _scan_ntriples() without going through the full Turtle grammar.
+_IRI_RE = r'<([A-Za-z][A-Za-z0-9+.-]*:[^<>"{}|^`\\\s]*)>'
+_BNODE_RE = r'_:([A-Za-z0-9_](?:[A-Za-z0-9_.-]*[A-Za-z0-9_-])?)'
+_LITERAL_RE = (r'"([^"\\\r\n]*)"'
+               r'(?:@([A-Za-z]+(?:-[A-Za-z0-9]+)*)|\^\^' + _IRI_RE + r')?')
+_STATEMENT_RE = re.compile(
+    rf'[ \t]*(?:{_IRI_RE}|{_BNODE_RE})[ \t]+{_IRI_RE}[ \t]+'
+    rf'(?:{_IRI_RE}|{_BNODE_RE}|{_LITERAL_RE})[ \t]*\.[ \t]*(?:#.*)?')
 
 # Standard vocabularies
 PROV    = Namespace("http://www.w3.org/ns/prov#")
@@ -23,75 +54,191 @@ UNIT    = Namespace("http://qudt.org/vocab/unit/")
 OA      = Namespace("http://www.w3.org/ns/oa#")
 DCTERMS = Namespace("http://purl.org/dc/terms/")
 
+# Terms used on every run, resolved once: Namespace attribute access builds a
+# new URIRef on each lookup.
+_RDF_TYPE            = RDF.type
+_RDF_VALUE           = RDF.value
+_RDFS_LABEL          = RDFS.label
+_XSD_STRING          = XSD.string
+_XSD_DECIMAL         = XSD.decimal
+_QV_TYPE             = QUDT.QuantityValue
+_NUM                 = QUDT.numericValue
+_UNIT                = QUDT.unit
+_MILLIM              = UNIT.MilliM
+_PROV_ENTITY         = PROV.Entity
+_USED                = PROV.used
+_GENERATED_BY        = PROV.wasGeneratedBy
+_DERIVED_FROM        = PROV.wasDerivedFrom
+_PPLAN_ENTITY        = PPLAN.Entity
+_CORRESPONDS_TO_STEP = PPLAN.correspondsToStep
+_OUTPUT_VAR_OF       = PPLAN.isOutputVarOf
+_CORRESPONDS_TO_VAR  = PPLAN.correspondsToVariable
+_ANNOTATION          = OA.Annotation
+_MOTIVATED_BY        = OA.motivatedBy
+_ASSESSING           = OA.assessing
+_HAS_TARGET          = OA.hasTarget
+_IDENTIFIER          = DCTERMS.identifier
+
+# Canonical URIRef per IRI string (sys.intern rejects str subclasses). Parsed
+# terms, the constants above and IRIs returned by prompts share one object,
+# so its str hash is computed once. Reset when it grows past _IRIS_MAX.
+_IRIS: dict = {}
+_IRIS_MAX = 100_000
+
+
+def _iri(value: str) -> URIRef:
+    term = _IRIS.get(value)
+    if term is None:
+        if len(_IRIS) >= _IRIS_MAX:
+            _IRIS.clear()
+        term = _IRIS[value] = URIRef(value)
+    return term
+
+
+for _term in (_RDF_TYPE, _RDF_VALUE, _RDFS_LABEL, _XSD_STRING, _XSD_DECIMAL,
+              _QV_TYPE, _NUM, _UNIT, _MILLIM, _PROV_ENTITY, _USED,
+              _GENERATED_BY, _DERIVED_FROM, _PPLAN_ENTITY,
+              _CORRESPONDS_TO_STEP, _OUTPUT_VAR_OF, _CORRESPONDS_TO_VAR,
+              _ANNOTATION, _MOTIVATED_BY, _ASSESSING, _HAS_TARGET, _IDENTIFIER):
+    _IRIS[str(_term)] = _term
+del _term
+
+# Standard prefix bindings, built once and shared by every output graph.
+_NSM = NamespaceManager(Graph())
+_NSM.bind("prov",    PROV)
+_NSM.bind("p-plan",  PPLAN)
+_NSM.bind("qudt",    QUDT)
+_NSM.bind("unit",    UNIT)
+_NSM.bind("oa",      OA)
+_NSM.bind("dcterms", DCTERMS)
+
 
 # ---------------------------------------------------------------------------
-# IRI helpers
+# Helpers
 # ---------------------------------------------------------------------------
 
-def data_ns_from_activity(activity_iri: str) -> str:
-    """Derive the data namespace from the activity IRI.
+def _new_output_graph() -> Graph:
+    """Create a fresh output graph with standard prefix bindings."""
+    out = Graph(store="SimpleMemory")
+    out.namespace_manager = _NSM
+    return out
 
-    The activity IRI is already in the correct default namespace
-    (e.g. http://example.com/SumRun_123), so we strip the local name
-    to get the base namespace for all output IRIs.
-    """
-    iri = str(activity_iri)
-    idx = max(iri.rfind('#'), iri.rfind('/'))
-    return iri[:idx + 1] if idx >= 0 else iri + '/'
 
+def _scan_ntriples(text: str):
+    """Read Turtle written as plain N-Triples lines.
 
-def create_execution_hash(activity_iri: str, *input_iris: str) -> str:
-    """Deterministic hash from activity IRI + input IRIs (order-independent)."""
-    sorted_inputs = sorted(str(iri) for iri in input_iris)
-    combined = str(activity_iri) + ''.join(sorted_inputs)
-    return hashlib.sha256(combined.encode('utf-8')).hexdigest()[:16]
+    Returns the list of triples, or None as soon as a line falls outside the
+    supported subset (prefixes, abbreviations, escapes, ...), in which case
+    the caller uses the full Turtle parser.
+    """
+    iri = _iri
+    bnodes = {}
+
+    def bnode(label):
+        term = bnodes.get(label)
+        if term is None:
+            term = bnodes[label] = BNode()
+        return term
+
+    triples = []
+    match = _STATEMENT_RE.fullmatch
+    for line in text.splitlines():
+        m = match(line)
+        if m is None:
+            stripped = line.strip()
+            if not stripped or stripped.startswith('#'):
+                continue
+            return None
+        s_iri, s_bn, p_iri, o_iri, o_bn, lex, lang, dtype = m.groups()
+
+        s = iri(s_iri) if s_iri else bnode(s_bn)
+        if o_iri:
+            o = iri(o_iri)
+        elif o_bn:
+            o = bnode(o_bn)
+        else:
+            o = Literal(lex, lang=lang, datatype=iri(dtype) if dtype else None)
+        triples.append((s, iri(p_iri), o))
+    return triples
+
+
+def parse_input(input_turtle: str) -> Graph:
+    """Parse the input Turtle, reusing the triples of an identical earlier input."""
+    key = hashlib.blake2b(input_turtle.encode('utf-8'), digest_size=16).digest()
+    g = Graph(store=_STORE)
+
+    triples = _PARSE_CACHE.get(key)
+    if triples is not None:
+        _PARSE_CACHE.move_to_end(key)
+        g.addN((s, p, o, g) for s, p, o in triples)
+        return g
+
+    triples = _scan_ntriples(input_turtle)
+    if triples is not None:
+        g.addN((s, p, o, g) for s, p, o in triples)
+    else:
+        g.parse(data=input_turtle, format=_TURTLE)
+    _PARSE_CACHE[key] = tuple(g)
+    if len(_PARSE_CACHE) > _PARSE_CACHE_SIZE:
+        _PARSE_CACHE.popitem(last=False)
+    return g
 
 
-def local_name(iri) -> str:
-    """Extract the local name from an IRI (after the last # or /)."""
-    s = str(iri)
-    idx = max(s.rfind('#'), s.rfind('/'))
-    return s[idx + 1:] if idx >= 0 else s
+def clear_parse_cache() -> None:
+    """Drop all cached parse results."""
+    _PARSE_CACHE.clear()
 
 
-def create_output_iri(data_ns: str, prefix: str, execution_hash: str) -> URIRef:
-    """Create a data-namespace IRI for an output entity (used for error annotations)."""
-    return URIRef(f"{data_ns}{prefix}_{execution_hash}")
+# Display and value properties of one QuantityValue.
+_QVRow = namedtuple("_QVRow", "label num unit unit_label")
 
 
-def activity_output_iri(activity_iri: str, out_var) -> URIRef:
-    """Derive the output entity IRI from the activity IRI + P-Plan output variable.
+def _qv_row(g: Graph, qv) -> _QVRow:
+    """Read a QuantityValue's label, value and unit in one pass over its triples."""
+    label = num = unit = None
+    for p, o in g.predicate_objects(qv):
+        if p == _NUM:
+            if num is None:
+                num = o
+        elif p == _RDFS_LABEL:
+            if label is None:
+                label = o
+        elif p == _UNIT:
+            if unit is None:
+                unit = o
+    unit_label = g.value(unit, _RDFS_LABEL) if unit is not None else None
+    return _QVRow(label, num, unit, unit_label)
 
-    Matches the IRI the app creates during instantiation:
-        activityIri + '_' + localname(outputVariable)
-    e.g. http://example.com/SumRun_1234_SumOutput
-    """
-    return URIRef(f"{activity_iri}_{local_name(out_var)}")
 
+def sum_numeric(lexical_values: list) -> tuple:
+    """Sum numeric lexical forms.
 
-# ---------------------------------------------------------------------------
-# Helpers
-# ---------------------------------------------------------------------------
+    Returns (total, None), or (None, index) of the first value that is not
+    numeric.
+    """
+    values = []
+    for idx, lex in enumerate(lexical_values):
+        try:
+            values.append(float(lex))
+        except ValueError:
+            return None, idx
+    return sum(values), None
 
-def cleanup_previous_result(g: Graph, result_iri: URIRef) -> int:
-    """Remove all triples for a previous result entity (idempotent re-runs)."""
-    triples = list(g.triples((result_iri, None, None))) + \
-              list(g.triples((None, None, result_iri)))
-    for t in triples:
-        g.remove(t)
-    return len(triples)
 
+def _serialize(out: Graph) -> str:
+    """Write the output graph as Turtle without rdflib's pretty-printer.
 
-def _new_output_graph() -> Graph:
-    """Create a fresh output graph with standard prefix bindings."""
-    out = Graph()
-    out.bind("prov",    PROV)
-    out.bind("p-plan",  PPLAN)
-    out.bind("qudt",    QUDT)
-    out.bind("unit",    UNIT)
-    out.bind("oa",      OA)
-    out.bind("dcterms", DCTERMS)
-    return out
+    The output only holds the handful of triples added by this step, so one
+    statement block per subject with full IRIs is enough; this skips the
+    serializer's subject sorting and qname computation.
+    """
+    blocks = {}
+    for s, p, o in out:
+        blocks.setdefault(s, []).append(f"{p.n3()} {o.n3()}")
+    return "".join(
+        f"{s.n3()} " + " ;\n    ".join(pos) + " .\n\n"
+        for s, pos in blocks.items()
+    )
 
 
 def _add_error(out: Graph, activity, message: str, code: str = None,
@@ -107,18 +254,23 @@ def _add_error(out: Graph, activity, message: str, code: str = None,
     ann_iri = create_output_iri(data_ns, "errorAnn", execution_hash)
     effective_target = target if target is not None else activity
 
-    out.add((ann_iri, RDF.type,        OA.Annotation))
-    out.add((ann_iri, OA.motivatedBy,  OA.assessing))
-    out.add((ann_iri, RDFS.label,      Literal(message, datatype=XSD.string)))
-    out.add((ann_iri, RDF.value,       Literal(message, datatype=XSD.string)))
+    msg = Literal(message, datatype=_XSD_STRING)
+    quads = [
+        (ann_iri, _RDF_TYPE,     _ANNOTATION, out),
+        (ann_iri, _MOTIVATED_BY, _ASSESSING,  out),
+        (ann_iri, _RDFS_LABEL,   msg,         out),
+        (ann_iri, _RDF_VALUE,    msg,         out),
+    ]
 
     if effective_target is not None:
-        out.add((ann_iri, OA.hasTarget, effective_target))
+        quads.append((ann_iri, _HAS_TARGET, effective_target, out))
     if activity is not None:
-        out.add((ann_iri, PROV.wasGeneratedBy, activity))
+        quads.append((ann_iri, _GENERATED_BY, activity, out))
 
     if code is not None:
-        out.add((ann_iri, DCTERMS.identifier, Literal(code, datatype=XSD.string)))
+        quads.append((ann_iri, _IDENTIFIER, Literal(code, datatype=_XSD_STRING), out))
+
+    out.addN(quads)
 
 
 # ---------------------------------------------------------------------------
@@ -137,46 +289,71 @@ def run(input_turtle: str, activity_iri: str) -> str:
         Output graph in Turtle format
     """
     data_ns = data_ns_from_activity(activity_iri)
-    g = Graph()
+    activity = _iri(activity_iri)
+    execution_hash = create_execution_hash(activity_iri)
+
+    # Without a single "QuantityValue" token the graph cannot hold any
+    # candidate, so report it without parsing.
+    if "QuantityValue" not in input_turtle:
+        out = _new_output_graph()
+        _add_error(out, activity,
+                   "Need at least 2 qudt:QuantityValue entities in graph. Found 0.",
+                   code="INPUT_TOO_FEW", data_ns=data_ns,
+                   execution_hash=execution_hash)
+        return _serialize(out)
 
     try:
-        g.parse(data=input_turtle, format="turtle")
+        g = parse_input(input_turtle)
     except Exception as e:
         out = _new_output_graph()
-        _add_error(out, activity=None,
-                   message=f"Failed to parse input graph: {e}",
-                   code="PARSE_ERROR",
-                   data_ns=data_ns)
-        return out.serialize(format="turtle")
+        _add_error(out, None, f"Failed to parse input graph: {e}",
+                   code="PARSE_ERROR", data_ns=data_ns)
+        return _serialize(out)
 
-    activity = URIRef(activity_iri)
+    return _serialize(run_graph(g, activity_iri))
 
-    # Discover qudt:QuantityValue entities in the graph
-    candidates = spw_input.find_candidates(g, activity, QUDT.QuantityValue, QUDT.numericValue)
 
+def run_graph(g: Graph, activity_iri: str) -> Graph:
+    """
+    Run the step on an already parsed input graph.
+
+    For in-process pipelines: skips the Turtle round trip that run() does
+    on both sides.
+
+    Args:
+        g: Input graph (rdflib.Graph)
+        activity_iri: IRI of the prov:Activity being executed
+
+    Returns:
+        Graph with only the new result triples
+    """
+    data_ns = data_ns_from_activity(activity_iri)
+    activity = _iri(activity_iri)
     execution_hash = create_execution_hash(activity_iri)
     out = _new_output_graph()
 
+    # Discover qudt:QuantityValue entities in the graph
+    candidates = spw_input.find_candidates(g, activity, _QV_TYPE, _NUM)
+
     if len(candidates) < 2:
         _add_error(out, activity,
                    f"Need at least 2 qudt:QuantityValue entities in graph. Found {len(candidates)}.",
                    code="INPUT_TOO_FEW", data_ns=data_ns,
                    execution_hash=execution_hash)
-        return out.serialize(format="turtle")
+        return out
+
+    qv_rows = {qv: _qv_row(g, qv) for qv in candidates}
 
     def _build_options(qv_list):
         opts = []
         for qv in qv_list:
-            rdfs_label = g.value(qv, RDFS.label)
-            num_val = g.value(qv, QUDT.numericValue)
-            unit = g.value(qv, QUDT.unit)
-            unit_label = g.value(unit, RDFS.label) if unit else None
-            if unit_label is None and unit is not None:
-                unit_label = local_name(unit)
-            display = str(rdfs_label) if rdfs_label else local_name(qv)
-            if num_val is not None:
-                unit_str = f" {unit_label}" if unit_label else ""
-                display = f"{display} ({num_val}{unit_str})"
+            row = qv_rows[qv]
+            unit_label = row.unit_label
+            if unit_label is None and row.unit is not None:
+                unit_label = local_name(row.unit)
+            display = str(row.label) if row.label else local_name(qv)
+            unit_str = f" {unit_label}" if unit_label else ""
+            display = f"{display} ({row.num}{unit_str})"
             opts.append({'label': display, 'value': str(qv)})
         return opts
 
@@ -187,80 +364,83 @@ def run(input_turtle: str, activity_iri: str) -> str:
     options = _build_options(remaining)
     try:
         sel_iri = spw_input.prompt_select("first value", options)
-        sel = URIRef(sel_iri)
+        sel = _iri(sel_iri)
         inputs.append(sel)
         remaining.remove(sel)
     except (spw_input.InputCancelled, spw_input.InputFailed) as exc:
         _add_error(out, activity, str(exc),
                    code="INPUT_CANCELLED", data_ns=data_ns,
                    execution_hash=execution_hash)
-        return out.serialize(format="turtle")
+        return out
 
     # Select second value
     options = _build_options(remaining)
     try:
         sel_iri = spw_input.prompt_select("second value", options)
-        sel = URIRef(sel_iri)
+        sel = _iri(sel_iri)
         inputs.append(sel)
         remaining.remove(sel)
     except (spw_input.InputCancelled, spw_input.InputFailed) as exc:
         _add_error(out, activity, str(exc),
                    code="INPUT_CANCELLED", data_ns=data_ns,
                    execution_hash=execution_hash)
-        return out.serialize(format="turtle")
+        return out
 
     # Offer additional values until cancelled or no more candidates
     while remaining:
         options = _build_options(remaining)
         try:
             sel_iri = spw_input.prompt_select("add another value (cancel to finish)", options)
-            sel = URIRef(sel_iri)
+            sel = _iri(sel_iri)
             inputs.append(sel)
             remaining.remove(sel)
         except (spw_input.InputCancelled, spw_input.InputFailed):
             break
 
     # Record prov:used for each selected input
-    for qv in inputs:
-        out.add((activity, PROV.used, qv))
+    out.addN((activity, _USED, qv, out) for qv in inputs)
 
-    values = []
+    lexical = []
     units = set()
+    missing = None
 
     for qv in inputs:
-        num = g.value(qv, QUDT.numericValue)
-        unit = g.value(qv, QUDT.unit)
+        row = qv_rows.get(qv)
+        if row is None or row.num is None:
+            missing = qv
+            break
 
-        if num is None:
-            _add_error(out, activity, f"Input {qv} has no qudt:numericValue",
-                       "MISSING_NUMERIC_VALUE", data_ns=data_ns,
-                       execution_hash=execution_hash, target=qv)
-            return out.serialize(format="turtle")
+        lexical.append(str(row.num))
+        if row.unit is not None:
+            units.add(row.unit)
 
-        try:
-            values.append(float(num))
-        except Exception:
-            _add_error(out, activity, f"Input {qv} has non-numeric value {num}",
-                       "NON_NUMERIC_VALUE", data_ns=data_ns,
-                       execution_hash=execution_hash, target=qv)
-            return out.serialize(format="turtle")
+    total, bad = sum_numeric(lexical)
+
+    if bad is not None:
+        qv = inputs[bad]
+        _add_error(out, activity, f"Input {qv} has non-numeric value {lexical[bad]}",
+                   "NON_NUMERIC_VALUE", data_ns=data_ns,
+                   execution_hash=execution_hash, target=qv)
+        return out
 
-        if unit is not None:
-            units.add(unit)
+    if missing is not None:
+        _add_error(out, activity, f"Input {missing} has no qudt:numericValue",
+                   "MISSING_NUMERIC_VALUE", data_ns=data_ns,
+                   execution_hash=execution_hash, target=missing)
+        return out
 
     if len(units) > 1:
         _add_error(out, activity,
                    "Inputs have different units: " + ", ".join(str(u) for u in units),
                    code="UNIT_MISMATCH", data_ns=data_ns,
                    execution_hash=execution_hash)
-        return out.serialize(format="turtle")
+        return out
 
-    unit_iri = next(iter(units)) if units else UNIT.MilliM
-    total = sum(values)
+    unit_iri = next(iter(units)) if units else _MILLIM
 
     # Find the template output variable this result corresponds to
-    step = g.value(activity, PPLAN.correspondsToStep)
-    out_var = g.value(predicate=PPLAN.isOutputVarOf, object=step) if step else None
+    step = g.value(activity, _CORRESPONDS_TO_STEP)
+    out_var = g.value(predicate=_OUTPUT_VAR_OF, object=step) if step else None
 
     # Build result IRI — derived from activityIri + P-Plan output variable local name,
     # matching the placeholder the app created during workflow instantiation.
@@ -269,18 +449,20 @@ def run(input_turtle: str, activity_iri: str) -> str:
     else:
         result_iri = create_output_iri(data_ns, "sumResult", execution_hash)
 
-    out.add((result_iri, RDF.type,                  QUDT.QuantityValue))
-    out.add((result_iri, RDF.type,                  PROV.Entity))
-    out.add((result_iri, RDF.type,                  PPLAN.Entity))
-    out.add((result_iri, RDFS.label,                Literal(f"Sum of {len(values)} values")))
-    out.add((result_iri, QUDT.numericValue,         Literal(total, datatype=XSD.decimal)))
-    out.add((result_iri, QUDT.unit,                 unit_iri))
-    out.add((result_iri, PROV.wasGeneratedBy,       activity))
+    quads = [
+        (result_iri, _RDF_TYPE,     _QV_TYPE,                                out),
+        (result_iri, _RDF_TYPE,     _PROV_ENTITY,                            out),
+        (result_iri, _RDF_TYPE,     _PPLAN_ENTITY,                           out),
+        (result_iri, _RDFS_LABEL,   Literal(f"Sum of {len(inputs)} values"), out),
+        (result_iri, _NUM,          Literal(total, datatype=_XSD_DECIMAL),   out),
+        (result_iri, _UNIT,         unit_iri,                                out),
+        (result_iri, _GENERATED_BY, activity,                                out),
+    ]
 
     if out_var:
-        out.add((result_iri, PPLAN.correspondsToVariable, out_var))
+        quads.append((result_iri, _CORRESPONDS_TO_VAR, out_var, out))
 
-    for qv in inputs:
-        out.add((result_iri, PROV.wasDerivedFrom, qv))
+    quads.extend((result_iri, _DERIVED_FROM, qv, out) for qv in inputs)
+    out.addN(quads)
 
-    return out.serialize(format="turtle")
+    return out